@@ -5,22 +5,64 @@ Serves the files locally to avoid CORS issues
 """
 
 import http.server
-import socketserver
+import socket
 import webbrowser
 import os
+from http import HTTPStatus
 from pathlib import Path
 
+class Handler(http.server.SimpleHTTPRequestHandler):
+    # HTTP/1.1 keep-alive lets the browser reuse connections for the
+    # bubbles.json + photo requests instead of reconnecting per file
+    protocol_version = "HTTP/1.1"
+
+    # ETag of the file being served, injected into headers by end_headers()
+    _etag = None
+
+    def send_head(self):
+        # Conditional GET support: an ETag from mtime+size lets the browser
+        # revalidate unchanged files (especially photos) with a bodyless 304
+        self._etag = None
+        path = self.translate_path(self.path)
+        if os.path.isfile(path):
+            try:
+                st = os.stat(path)
+                self._etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+            except OSError:
+                pass
+            if self._etag and self.headers.get('If-None-Match') == self._etag:
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.end_headers()
+                return None
+        return super().send_head()
+
+    def end_headers(self):
+        if self._etag:
+            self.send_header('ETag', self._etag)
+            self.send_header('Cache-Control', 'public, max-age=60')
+            self._etag = None
+        super().end_headers()
+
+class Server(http.server.ThreadingHTTPServer):
+    # Rebind immediately after Ctrl+C instead of waiting out TIME_WAIT
+    allow_reuse_address = True
+    allow_reuse_port = True
+
+    def server_bind(self):
+        super().server_bind()
+        # Push small JSON replies out right away instead of waiting on Nagle
+        self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
 def start_server():
     # Get the directory where this script is located
     script_dir = Path(__file__).parent
     os.chdir(script_dir)
-    
-    # Set up the server
+
+    # Set up the server (threaded, so photos load concurrently)
     PORT = 8000
-    Handler = http.server.SimpleHTTPRequestHandler
-    
+
     try:
-        with socketserver.TCPServer(("", PORT), Handler) as httpd:
+        with Server(("", PORT), Handler) as httpd:
             print("=" * 50)
             print("Mymory Local Server")
             print("=" * 50)